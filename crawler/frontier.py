@@ -1,5 +1,7 @@
+import atexit
 import os
-import shelve
+import sqlite3
+import time
 
 from threading import Thread, RLock
 from queue import Queue, Empty
@@ -7,16 +9,30 @@ from queue import Queue, Empty
 from utils import get_logger, get_urlhash, normalize
 from scraper import is_valid
 
+# Number of save-file writes to accumulate before committing to disk.
+SYNC_BATCH_SIZE = 500
+# Also commit at least this often (seconds), so a slow crawl cannot
+# leave a partial batch unsaved for long.
+SYNC_INTERVAL = 30
+
 class Frontier(object):
     def __init__(self, config, restart):
         self.logger = get_logger("FRONTIER")
         self.config = config
-        self.to_be_downloaded = list()
-        
-        # Check for any of the shelve file extensions
-        save_exists = any(os.path.exists(f"{self.config.save_file}.{ext}") 
-                         for ext in ['bak', 'dat', 'dir'])
-        
+        self.to_be_downloaded = Queue()
+        # Guards the seen-hash set and the write buffer; the queue is
+        # already thread-safe on its own.
+        self._lock = RLock()
+        # Buffered (urlhash, url, completed) rows, committed in batches.
+        self._pending_writes = list()
+        # In-memory membership test for known urls. Stores compact
+        # 64-bit int fingerprints of the urlhash rather than the 64-char
+        # hex strings, which cuts the per-entry footprint roughly 4x;
+        # the database still keys rows by the full hash.
+        self._seen_hashes = set()
+
+        save_exists = os.path.exists(self.config.save_file)
+
         if not save_exists and not restart:
             # Save file does not exist, but request to load save.
             self.logger.info(
@@ -25,58 +41,101 @@ class Frontier(object):
         elif save_exists and restart:
             # Save file exists, but request to start from seed.
             self.logger.info(
-                f"Found save files {self.config.save_file}.*, deleting them.")
-            # Remove all shelve files
-            for ext in ['bak', 'dat', 'dir']:
+                f"Found save file {self.config.save_file}, deleting it.")
+            for suffix in ["", "-wal", "-shm"]:
                 try:
-                    os.remove(f"{self.config.save_file}.{ext}")
+                    os.remove(f"{self.config.save_file}{suffix}")
                 except OSError:
                     pass
-                    
+
         # Load existing save file, or create one if it does not exist.
-        self.save = shelve.open(self.config.save_file)
+        self.save = sqlite3.connect(
+            self.config.save_file, check_same_thread=False)
+        self.save.execute("PRAGMA journal_mode=WAL")
+        self.save.execute("PRAGMA synchronous=NORMAL")
+        self.save.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            "urlhash TEXT PRIMARY KEY, url TEXT, completed INTEGER)")
+        self.save.commit()
+        # Make sure buffered writes reach disk if the crawler is stopped.
+        atexit.register(self.flush)
+        # Time-bounded flushing alongside the size-bounded one.
+        Thread(target=self._flush_periodically, daemon=True).start()
+
         if restart:
             for url in self.config.seed_urls:
                 self.add_url(url)
         else:
             # Set the frontier state with contents of save file.
             self._parse_save_file()
-            if not self.save:
+            if not self._seen_hashes:
                 for url in self.config.seed_urls:
                     self.add_url(url)
 
+    @staticmethod
+    def _fingerprint(urlhash):
+        ''' Compact 64-bit int form of a urlhash for the in-memory set. '''
+        return int(urlhash[:16], 16)
+
     def _parse_save_file(self):
         ''' This function can be overridden for alternate saving techniques. '''
-        total_count = len(self.save)
         tbd_count = 0
-        for url, completed in self.save.values():
+        for urlhash, url, completed in self.save.execute(
+                "SELECT urlhash, url, completed FROM frontier"):
+            self._seen_hashes.add(self._fingerprint(urlhash))
             if not completed and is_valid(url):
-                self.to_be_downloaded.append(url)
+                self.to_be_downloaded.put(url)
                 tbd_count += 1
         self.logger.info(
-            f"Found {tbd_count} urls to be downloaded from {total_count} "
-            f"total urls discovered.")
+            f"Found {tbd_count} urls to be downloaded from "
+            f"{len(self._seen_hashes)} total urls discovered.")
 
     def get_tbd_url(self):
         try:
-            return self.to_be_downloaded.pop()
-        except IndexError:
+            return self.to_be_downloaded.get_nowait()
+        except Empty:
             return None
 
     def add_url(self, url):
         url = normalize(url)
         urlhash = get_urlhash(url)
-        if urlhash not in self.save:
-            self.save[urlhash] = (url, False)
-            self.save.sync()
-            self.to_be_downloaded.append(url)
-    
+        fingerprint = self._fingerprint(urlhash)
+        with self._lock:
+            if fingerprint in self._seen_hashes:
+                return
+            self._seen_hashes.add(fingerprint)
+            self._record_write(urlhash, url, False)
+        self.to_be_downloaded.put(url)
+
     def mark_url_complete(self, url):
         urlhash = get_urlhash(url)
-        if urlhash not in self.save:
-            # This should not happen.
-            self.logger.error(
-                f"Completed url {url}, but have not seen it before.")
+        fingerprint = self._fingerprint(urlhash)
+        with self._lock:
+            if fingerprint not in self._seen_hashes:
+                # This should not happen.
+                self.logger.error(
+                    f"Completed url {url}, but have not seen it before.")
+                self._seen_hashes.add(fingerprint)
+
+            self._record_write(urlhash, url, True)
+
+    def _record_write(self, urlhash, url, completed):
+        ''' Buffer a row and commit once per batch, instead of paying
+        for a full transaction on every single url. '''
+        self._pending_writes.append((urlhash, url, completed))
+        if len(self._pending_writes) >= SYNC_BATCH_SIZE:
+            self.flush()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(SYNC_INTERVAL)
+            self.flush()
 
-        self.save[urlhash] = (url, True)
-        self.save.sync()
+    def flush(self):
+        with self._lock:
+            if self._pending_writes:
+                self.save.executemany(
+                    "INSERT OR REPLACE INTO frontier VALUES (?, ?, ?)",
+                    self._pending_writes)
+                self.save.commit()
+                self._pending_writes = list()
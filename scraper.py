@@ -1,10 +1,17 @@
 import re
-from urllib.parse import urlparse, urljoin, urldefrag
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from urllib.parse import urlsplit, urljoin, urldefrag, parse_qsl
+from lxml import etree, html as lxml_html
 from collections import Counter, defaultdict
-import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from cachetools import LRUCache
+from sortedcontainers import SortedSet
+from heapq import nlargest
+from operator import itemgetter
+import atexit
+import xxhash
 import os
-from threading import Lock
+from threading import Event, Lock, Thread
 import logging
 
 # Ensure report directory exists
@@ -26,8 +33,13 @@ logging.basicConfig(
 def log_info(message):
     logging.info(message)
 
+# Per-url / per-link chatter goes to DEBUG so it costs one C-level
+# isEnabledFor check under the default INFO logging level
+def log_debug(message):
+    logging.debug(message)
+
 # Common English stop words
-STOP_WORDS = {
+STOP_WORDS = frozenset({
     'a', 'also', 'about', 'above', 'after', 'again', 'against', 'all', 'am', 'an', 'and',
     'any', 'are', "aren", 'as', 'at', 'be', 'because', 'been', 'before', 'being',
     'below', 'between', 'both', 'but', 'by', "can", 'cannot', 'could', "couldn",
@@ -48,69 +60,197 @@ STOP_WORDS = {
     'while', 'who', 'whom', 'why', 'will', 'with', 'would',
     "wouldn", 'you', 'your', 'yours',
     'yourself', 'yourselves'
-}
+})
 
 # Non-words that should be ignored, such as http, www or extensions like xml, dav (ICS is allowed)
-NON_WORDS = {
+NON_WORDS = frozenset({
     'http', 'https', 'xml', 'www', 'edu', 'dav', 'bdd', 'll', 're', 've', 'cfg', 'simse', 'sc', 'dt', 'markellekelly', 'br'
-}
+})
+
+# Combined filter set so the tokenizer does one membership test per token
+FILTERED_WORDS = STOP_WORDS | NON_WORDS
+
+# 256-entry classification table: ascii letters map to their lowercase
+# byte, everything else maps to space, so one bytes.translate call does
+# the lowercase + word-boundary pass entirely in C
+TOKEN_TABLE = bytes(
+    (ord(chr(i).lower()) if chr(i).isalpha() and i < 128 else 0x20)
+    for i in range(256))
 
 # Global variables to track statistics
-unique_pages = set()
-page_word_counts = {}
+unique_pages = SortedSet()  # Kept sorted so report flushes never re-sort
+longest_page = None  # Running (url, word_count) maximum, updated per page
 word_frequencies = Counter()
 subdomains = defaultdict(set)  # Changed to track unique pages per subdomain
 report_lock = Lock()  # Thread safety for report writing
-url_patterns = defaultdict(int)  # Track URL pattern frequencies
-content_hashes = defaultdict(list)  # Track content similarity
+stats_lock = Lock()  # Guards the statistics/trap state above across workers
+
+# Pool of parser processes so page parsing runs outside the GIL; created
+# lazily on first use to keep module import side-effect free.
+parse_pool = None
+parse_pool_lock = Lock()
+# Trap-detection state is bounded: least-recently-seen patterns and
+# fingerprints get evicted so memory stays capped over a long crawl.
+TRAP_STATE_MAX_ENTRIES = 200_000
+url_patterns = LRUCache(TRAP_STATE_MAX_ENTRIES)  # Track URL pattern frequencies
+content_hash_counts = LRUCache(TRAP_STATE_MAX_ENTRIES)  # Pages per content fingerprint
 MAX_PATTERN_REPEAT = 10  # Maximum times a URL pattern can repeat
 MAX_SIMILAR_CONTENT = 5  # Maximum number of pages with similar content
 MIN_WORDS_PER_PAGE = 50  # Minimum words for a page to be considered content-rich
+MIN_CONTENT_BYTES = 256  # Bodies smaller than this cannot hold that many words
+REPORT_FLUSH_INTERVAL = 30  # Seconds between report rewrites
+REPORT_FLUSH_PAGES = 500  # Or force a rewrite after this many new pages
+
+# Report-flush bookkeeping, guarded by stats_lock; the flusher thread is
+# started lazily by the first update_stats call.
+reports_dirty = False
+pages_since_flush = 0
+report_flush_event = Event()
+report_flusher_thread = None
+
+# Buffered cache-server error entries, appended to disk in batches;
+# guarded by report_lock.
+CACHE_ERROR_BUFFER_SIZE = 20
+cache_error_buffer = []
+
+# The same url gets parsed several times on its way through is_valid,
+# get_url_pattern and update_stats; cache the pure-Python parse so each
+# unique url pays for it once. urlsplit skips the ;params field that
+# urlparse additionally separates, which nothing here reads.
+urlsplit = lru_cache(maxsize=65536)(urlsplit)
+urldefrag = lru_cache(maxsize=65536)(urldefrag)
+
+# Allowed crawl domains: exact hosts plus dotted suffixes for their
+# subdomains. str.endswith over a tuple is a single C-level pass, and the
+# leading dot keeps lookalikes such as notics.uci.edu out.
+ALLOWED_DOMAINS = frozenset({
+    "ics.uci.edu", "cs.uci.edu", "informatics.uci.edu", "stat.uci.edu"})
+ALLOWED_DOMAIN_SUFFIXES = tuple("." + domain for domain in ALLOWED_DOMAINS)
+
+# File extensions to avoid, tested as a set lookup on whatever follows
+# the last dot in the path; constant-time membership instead of walking
+# a forty-alternative regex for every candidate link.
+BAD_EXTENSIONS = frozenset({
+    "css", "js", "bmp", "gif", "jpg", "jpeg", "ico",
+    "png", "tif", "tiff", "mid", "mp2", "mp3", "mp4",
+    "wav", "avi", "mov", "mpeg", "ram", "m4v", "mkv", "ogg", "ogv", "pdf",
+    "ps", "eps", "tex", "ppt", "pptx", "pps", "ppsx", "doc", "docx",
+    "xls", "xlsx", "names",
+    "data", "dat", "exe", "bz2", "tar", "msi", "bin", "7z", "psd",
+    "dmg", "iso",
+    "epub", "dll", "cnf", "tgz", "sha1", "sql", "mpg", "ova",
+    "thmx", "mso", "arff", "rtf", "jar", "csv",
+    "rm", "smil", "wmv", "swf", "wma", "zip", "rar", "gz"})
+# One pass over the query string replaces split('&') + any + sum for
+# counting filter parameters
+FILTER_PARAM_RE = re.compile(r"(?:^|&)filter")
+# Shared constant containers, hoisted so hot functions stop
+# re-allocating them per call
+VALID_SCHEMES = frozenset({"http", "https"})
+KEPT_QUERY_PARAMS = frozenset({
+    "seminar_id", "event_id", "post_id", "page_id", "archive_year"})
+CBCL_BLOCKED_ACTIONS = frozenset({
+    "login", "recent", "revisions", "diff", "edit", "backlink",
+    "resendpwd", "index", ""})
+WIKI_BLOCKED_PARAMS = ("do", "rev", "tab_files", "tab_details", "image")
+WIKI_UTILITY_NAMESPACES = frozenset({"projects", "media", "wiki", "windows"})
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/acrobat")
+PDF_PATH_INDICATORS = ("/pdf/", "/pdfs/", "/files/pdf/")
+
+# Patterns for get_url_pattern and the subdomain report
+DIGIT_RE = re.compile(r"\d+")
+YEAR_RANGE_RE = re.compile(r"\d{4}-\d{4}")
+ICS_SUBDOMAIN_RE = re.compile(r"^(?!informatics\.)([\w-]+\.)?ics\.uci\.edu$")
+
+def _write_report(name, content):
+    """Atomically replace a report file with new content.
+
+    Writing to a sibling tmp file and os.replace-ing it in means a
+    reader opening the report mid-rewrite sees either the old or the
+    new version, never a truncated one.
+    """
+    final_path = os.path.join(REPORT_DIR, name)
+    tmp_path = f"{final_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, final_path)
 
 def update_reports():
     """Update all report files with current statistics"""
+    # Snapshot shared state first so file writing happens outside
+    # stats_lock and workers are never blocked on disk I/O.
+    with stats_lock:
+        pages = list(unique_pages)  # SortedSet iterates in order
+        longest = longest_page
+        top_words = nlargest(50, word_frequencies.items(), key=itemgetter(1))
+        subdomain_counts = sorted(
+            (domain, len(sub_pages)) for domain, sub_pages in subdomains.items())
+
+    # Each report is rendered in memory first, so report_lock only
+    # covers the tmp-write + rename and not the formatting work.
+    reports = {}
+
+    # 1. Unique pages report
+    lines = [f"Number of unique pages found: {len(pages)}\n\n",
+             "List of unique pages:\n"]
+    lines.extend(f"{page}\n" for page in pages)
+    reports["unique_pages.txt"] = "".join(lines)
+
+    # 2. Longest page report
+    if longest:
+        reports["longest_page.txt"] = (
+            f"URL: {longest[0]}\nWord count: {longest[1]}\n")
+
+    # 3. Common words report
+    lines = ["50 most common words and their frequencies:\n"]
+    lines.extend(f"{word}: {freq}\n" for word, freq in top_words)
+    reports["common_words.txt"] = "".join(lines)
+
+    # 4. Subdomains report
+    lines = ["Subdomains of ics.uci.edu and their unique page counts:\n"]
+    # Match ics.uci.edu or *.ics.uci.edu but not informatics.uci.edu
+    lines.extend(f"{domain}, {count}\n" for domain, count in subdomain_counts
+                 if ICS_SUBDOMAIN_RE.match(domain))
+    reports["subdomains.txt"] = "".join(lines)
+
     with report_lock:
-        # 1. Unique pages report
-        with open(os.path.join(REPORT_DIR, "unique_pages.txt"), "w") as f:
-            f.write(f"Number of unique pages found: {len(unique_pages)}\n\n")
-            f.write("List of unique pages:\n")
-            for page in sorted(unique_pages):
-                f.write(f"{page}\n")
-
-        # 2. Longest page report
-        if page_word_counts:
-            longest_url = max(page_word_counts.items(), key=lambda x: x[1])
-            with open(os.path.join(REPORT_DIR, "longest_page.txt"), "w") as f:
-                f.write(f"URL: {longest_url[0]}\n")
-                f.write(f"Word count: {longest_url[1]}\n")
-
-        # 3. Common words report
-        with open(os.path.join(REPORT_DIR, "common_words.txt"), "w") as f:
-            f.write("50 most common words and their frequencies:\n")
-            for word, freq in word_frequencies.most_common(50):
-                f.write(f"{word}: {freq}\n")
-
-        # 4. Subdomains report
-        with open(os.path.join(REPORT_DIR, "subdomains.txt"), "w") as f:
-            f.write("Subdomains of ics.uci.edu and their unique page counts:\n")
-            # Sort subdomains alphabetically
-            sorted_subdomains = sorted(subdomains.items(), key=lambda x: x[0])
-            for domain, pages in sorted_subdomains:
-                # Match ics.uci.edu or *.ics.uci.edu but not informatics.uci.edu
-                if re.match(r'^(?!informatics\.)([\w-]+\.)?ics\.uci\.edu$', domain):
-                    f.write(f"{domain}, {len(pages)}\n")
-
-def tokenize_text(text):
-    """Simple regex-based word tokenizer from assignment 1"""
-    words = re.findall(r"[a-zA-Z]+", text.lower())
-    return [word for word in words 
-            if word not in STOP_WORDS 
-            and word not in NON_WORDS
-            and len(word) > 1]
+        for name, content in reports.items():
+            _write_report(name, content)
+
+def flush_reports():
+    """Rewrite the report files if anything changed since the last flush"""
+    global reports_dirty, pages_since_flush
+    with stats_lock:
+        if not reports_dirty:
+            return
+        reports_dirty = False
+        pages_since_flush = 0
+    update_reports()
+
+def report_flusher():
+    """Background loop: rewrite reports on a timer (or early when many
+    pages have accumulated) instead of once per crawled page."""
+    while True:
+        report_flush_event.wait(REPORT_FLUSH_INTERVAL)
+        report_flush_event.clear()
+        flush_reports()
+
+def tokenize_text(text, _filtered=FILTERED_WORDS):
+    """Single-pass table-driven word tokenizer, yielding tokens lazily.
+
+    Classifies and lowercases every byte through TOKEN_TABLE in one
+    bytes.translate call, so the per-character work happens in C and
+    only the stop-word filter runs per token. Produces the same tokens
+    as the old regex tokenizer from assignment 1, but as a generator so
+    callers that just feed a Counter never hold the full token list.
+    """
+    stream = text.encode('ascii', 'replace').translate(TOKEN_TABLE)
+    return (word for word in stream.decode('ascii').split()
+            if len(word) > 1 and word not in _filtered)
 
 def get_url_pattern(url):
     """Extract pattern from URL for trap detection"""
-    parsed = urlparse(url)
+    parsed = urlsplit(url)
     
     # Special handling for wiki URLs
     if 'wiki.ics.uci.edu' in parsed.netloc or 'swiki.ics.uci.edu' in parsed.netloc:
@@ -123,7 +263,7 @@ def get_url_pattern(url):
             
             # If there's a query string, only keep the page ID if present
             if parsed.query:
-                query_params = dict(param.split('=', 1) for param in parsed.query.split('&') if '=' in param)
+                query_params = dict(parse_qsl(parsed.query, keep_blank_values=True))
                 page_id = query_params.get('id', '')
                 if page_id:
                     wiki_path = page_id
@@ -137,28 +277,26 @@ def get_url_pattern(url):
         path_parts = parsed.path.split('/')
         path_pattern = []
         for part in path_parts:
-            if part.startswith('department-seminars-') and re.search(r'\d{4}-\d{4}', part):
+            if part.startswith('department-seminars-') and YEAR_RANGE_RE.search(part):
                 path_pattern.append(part)  # Keep the entire year range intact
             else:
-                path_pattern.append(re.sub(r'\d+', 'N', part))
+                path_pattern.append(DIGIT_RE.sub('N', part))
         path_pattern = '/'.join(path_pattern)
     else:
         # Normal path handling for other URLs
-        path_pattern = re.sub(r'\d+', 'N', parsed.path)
+        path_pattern = DIGIT_RE.sub('N', parsed.path)
     
     # Handle query parameters
     if parsed.query:
-        # Parse query parameters
+        # Parse query parameters once with the C-level helper
         query_params = {}
-        for param in parsed.query.split('&'):
-            if '=' in param:
-                key, value = param.split('=', 1)
-                # Keep specific query parameters intact
-                if key in ['seminar_id', 'event_id', 'post_id', 'page_id', 'archive_year']:
-                    query_params[key] = value
-                else:
-                    # Replace numbers with N in other parameter values
-                    query_params[key] = re.sub(r'\d+', 'N', value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True):
+            # Keep specific query parameters intact
+            if key in KEPT_QUERY_PARAMS:
+                query_params[key] = value
+            else:
+                # Replace numbers with N in other parameter values
+                query_params[key] = DIGIT_RE.sub('N', value)
         
         # Reconstruct query string with sorted parameters for consistent comparison
         query_pattern = '&'.join(f"{k}={v}" for k, v in sorted(query_params.items()))
@@ -166,21 +304,32 @@ def get_url_pattern(url):
     
     return f"{parsed.netloc}{path_pattern}"
 
-def get_content_hash(text):
-    """Generate hash of page content for similarity detection."""
-    words = tokenize_text(text)
-    
+def hash_words(words):
+    """Feed words into the hasher one by one; avoids joining them into
+    a single throwaway string first. Tokens are pure ascii. Returns the
+    64-bit integer digest, which keys content_hash_counts in 8 bytes
+    instead of a hex string."""
+    hasher = xxhash.xxh3_64()
+    for word in words:
+        hasher.update(word.encode('ascii'))
+        hasher.update(b' ')
+    return hasher.intdigest()
+
+def get_content_hash(words, detailed=False):
+    """Fingerprint a page's token stream for similarity detection.
+
+    Takes the already-tokenized words so callers that have tokenized
+    for counting do not pay for a second pass; detailed=True hashes
+    every word (used for archive search pages) instead of a sample.
+    """
     # Skip very short content
     if len(words) < 20:
         return None
-        
-    # For archive.ics.uci.edu URLs with search parameters, be more strict
-    if 'archive.ics.uci.edu' in text and ('search=' in text or 'Keywords=' in text):
-        # For search pages, create a more detailed hash
-        all_words = ' '.join(words)
-        return hashlib.md5(all_words.encode('utf-8')).hexdigest()
-    
-    # For other pages, use a sample of words from different parts of the content
+
+    if detailed:
+        return hash_words(words)
+
+    # Use a sample of words from different parts of the content
     word_count = len(words)
     if word_count <= 1000:
         sampled_words = words
@@ -190,84 +339,152 @@ def get_content_hash(text):
         middle = words[word_count//2-150:word_count//2+150]
         end = words[-300:]
         sampled_words = start + middle + end
-    
-    return hashlib.md5(' '.join(sampled_words).encode('utf-8')).hexdigest()
-
-def is_trap(url, content):
-    """Detect if URL or content indicates a trap"""
-    # Check URL pattern repetition
-    pattern = get_url_pattern(url)
-    url_patterns[pattern] += 1
-    if url_patterns[pattern] > MAX_PATTERN_REPEAT:
-        log_info(f"Trap detected: URL pattern {pattern} repeated too many times")
-        return True
-        
-    # Check content similarity
-    if content:
-        content_hash = get_content_hash(content)
-        if content_hash is None:
-            return False  # Skip similarity check for very short content
-            
-        similar_pages = content_hashes[content_hash]
-        if len(similar_pages) >= MAX_SIMILAR_CONTENT:
-            log_info(f"Trap detected: Too many similar pages with hash {content_hash}")
-            log_info(f"Similar pages: {', '.join(similar_pages)}")
+
+    return hash_words(sampled_words)
+
+def is_trap(url, content_hash=None):
+    """Detect if URL or content fingerprint indicates a trap"""
+    with stats_lock:
+        # Check URL pattern repetition
+        pattern = get_url_pattern(url)
+        pattern_count = url_patterns.get(pattern, 0) + 1
+        url_patterns[pattern] = pattern_count
+        if pattern_count > MAX_PATTERN_REPEAT:
+            log_info(f"Trap detected: URL pattern {pattern} repeated too many times")
             return True
-        similar_pages.append(url)
-    
+
+        # Check content similarity; hash is None for very short content
+        if content_hash is not None:
+            count = content_hash_counts.get(content_hash, 0)
+            if count >= MAX_SIMILAR_CONTENT:
+                log_info(f"Trap detected: Too many similar pages with hash {content_hash}")
+                return True
+            content_hash_counts[content_hash] = count + 1
+
     return False
 
-def update_stats(url, words):
-    """Update statistics and reports"""
-    # Update unique pages
-    unique_pages.add(url)
-    
-    # Update word count for the page
-    page_word_counts[url] = len(words)
-    
-    # Update word frequencies
-    word_frequencies.update(words)
-    
-    # Update subdomain statistics
-    parsed_url = urlparse(url)
-    netloc = parsed_url.netloc.lower()
-    subdomains[netloc].add(url)
-    
-    # Update report files
-    update_reports()
+def update_stats(url, token_counts):
+    """Merge one page's token counts into the crawl-wide statistics"""
+    global reports_dirty, pages_since_flush, report_flusher_thread, longest_page
+    with stats_lock:
+        # Update unique pages
+        unique_pages.add(url)
+
+        # Update word count for the page and the running maximum
+        word_count = sum(token_counts.values())
+        if longest_page is None or word_count > longest_page[1]:
+            longest_page = (url, word_count)
+
+        # Update word frequencies
+        word_frequencies.update(token_counts)
+
+        # Update subdomain statistics
+        parsed_url = urlsplit(url)
+        netloc = parsed_url.netloc.lower()
+        subdomains[netloc].add(url)
+
+        # Mark reports stale; the flusher thread rewrites them.
+        reports_dirty = True
+        pages_since_flush += 1
+        flush_early = pages_since_flush >= REPORT_FLUSH_PAGES
+        if report_flusher_thread is None:
+            report_flusher_thread = Thread(target=report_flusher, daemon=True)
+            report_flusher_thread.start()
+            atexit.register(flush_reports)
+    if flush_early:
+        report_flush_event.set()
 
 def log_cache_error(url, status, response):
-    """Log 6XX status codes which are specific cache server responses"""
+    """Log 6XX status codes which are specific cache server responses.
+
+    Entries are buffered and appended in batches so each error does not
+    pay for an open/write/flush/close cycle of its own.
+    """
     try:
+        entry = [f"\nURL: {url}\n", f"Status Code: {status}\n"]
+        # Log the raw response content if available
+        if hasattr(response, 'raw_response') and hasattr(response.raw_response, 'content'):
+            try:
+                content = response.raw_response.content.decode('utf-8')
+                entry.append(f"Response Content: {content}\n")
+            except:
+                entry.append("Response Content: [Unable to decode response content]\n")
+        entry.append("-" * 80 + "\n")
+
         with report_lock:
-            # Ensure the report directory exists
-            os.makedirs(REPORT_DIR, exist_ok=True)
-            
-            cache_error_file = os.path.join(REPORT_DIR, "cache_errors.txt")
-            # Create the file if it doesn't exist
-            if not os.path.exists(cache_error_file):
-                open(cache_error_file, 'w').close()
-                
-            with open(cache_error_file, "a") as f:
-                f.write(f"\nURL: {url}\n")
-                f.write(f"Status Code: {status}\n")
-                # Log the raw response content if available
-                if hasattr(response, 'raw_response') and hasattr(response.raw_response, 'content'):
-                    try:
-                        content = response.raw_response.content.decode('utf-8')
-                        f.write(f"Response Content: {content}\n")
-                    except:
-                        f.write("Response Content: [Unable to decode response content]\n")
-                f.write("-" * 80 + "\n")
-                f.flush()  # Ensure the content is written immediately
+            cache_error_buffer.append(''.join(entry))
+            flush_now = len(cache_error_buffer) >= CACHE_ERROR_BUFFER_SIZE
+        if flush_now:
+            flush_cache_errors()
     except Exception as e:
         log_info(f"Error logging cache error for {url}: {str(e)}")
 
+def flush_cache_errors():
+    """Append buffered cache-error entries to disk in one write"""
+    with report_lock:
+        if not cache_error_buffer:
+            return
+        entries = ''.join(cache_error_buffer)
+        del cache_error_buffer[:]
+        with open(os.path.join(REPORT_DIR, "cache_errors.txt"), "a") as f:
+            f.write(entries)
+
+atexit.register(flush_cache_errors)
+
+def get_parse_pool():
+    """Lazily create the shared pool of parser processes."""
+    global parse_pool
+    with parse_pool_lock:
+        if parse_pool is None:
+            parse_pool = ProcessPoolExecutor(os.cpu_count())
+    return parse_pool
+
+def parse_page(content):
+    """CPU-only parse of one page; runs inside a pool process.
+
+    Touches no shared crawl state so the submitting worker thread can
+    merge the returned token counts, content fingerprint and raw hrefs
+    under the appropriate locks.
+    """
+    tree = lxml_html.fromstring(content)
+    # Remove script, style, and other non-content elements
+    etree.strip_elements(
+        tree, 'script', 'style', 'nav', 'header', 'footer', 'noscript',
+        with_tail=False)
+    # One traversal collects both the text and the anchors instead of a
+    # full itertext() walk followed by a second xpath walk
+    text_parts = []
+    hrefs = []
+    for node in tree.iter():
+        tag = node.tag
+        if isinstance(tag, str):  # skip comments/processing instructions
+            if tag == 'a':
+                href = node.get('href')
+                if href:
+                    hrefs.append(href.strip())
+            if node.text:
+                text_parts.append(node.text)
+        if node.tail:
+            text_parts.append(node.tail)
+    # Stream-tokenize each text node directly; joining them into one
+    # page-sized string first would only be allocated to be re-split.
+    # Node boundaries are word boundaries, same as the old join(' ').
+    words = []
+    for part in text_parts:
+        words.extend(tokenize_text(part))
+    token_counts = Counter(words)
+    # archive.ics.uci.edu search pages get the detailed every-word hash
+    detailed = (
+        any('archive.ics.uci.edu' in part for part in text_parts)
+        and any('search=' in part or 'Keywords=' in part for part in text_parts))
+    content_hash = get_content_hash(words, detailed)
+    return token_counts, content_hash, hrefs
+
 def scraper(url, resp):
-    log_info(f"\nProcessing URL: {url}")
+    log_debug(f"Processing URL: {url}")
     links = extract_next_links(url, resp)
     valid_links = [link for link in links if is_valid(link)]
-    log_info(f"Found {len(links)} links, {len(valid_links)} valid")
+    log_debug(f"Found {len(links)} links, {len(valid_links)} valid")
     return valid_links
 
 def extract_next_links(url, resp):
@@ -275,16 +492,16 @@ def extract_next_links(url, resp):
     
     # Handle various response issues
     if not resp.raw_response:
-        log_info(f"Skipping {url} due to no raw response")
+        log_debug(f"Skipping {url} due to no raw response")
         return extracted_links
 
     # Check content type for non-HTML content
     content_type = resp.raw_response.headers.get('Content-Type', '').lower()
     if 'text/html' not in content_type:
-        if any(t in content_type for t in ['application/pdf', 'application/x-pdf', 'application/acrobat']):
-            log_info(f"Skipping {url}: PDF content detected via Content-Type: {content_type}")
+        if any(t in content_type for t in PDF_CONTENT_TYPES):
+            log_debug(f"Skipping {url}: PDF content detected via Content-Type: {content_type}")
         else:
-            log_info(f"Skipping {url}: non-HTML content type: {content_type}")
+            log_debug(f"Skipping {url}: non-HTML content type: {content_type}")
         return extracted_links
 
     # Check if this was a successful response
@@ -293,7 +510,21 @@ def extract_next_links(url, resp):
         if 600 <= resp.status < 700:
             log_info(f"Cache server error for {url} with status {resp.status}")
             log_cache_error(url, resp.status, resp)
-        log_info(f"Skipping {url} due to status {resp.status}")
+        log_debug(f"Skipping {url} due to status {resp.status}")
+        return extracted_links
+
+    # A body this small cannot contain MIN_WORDS_PER_PAGE words, so skip
+    # the parse entirely; prefer the Content-Length header, fall back to
+    # the actual body size.
+    content_length = resp.raw_response.headers.get('Content-Length')
+    try:
+        if int(content_length) < MIN_CONTENT_BYTES:
+            log_debug(f"Skipping {url}: Content-Length {content_length} too small")
+            return extracted_links
+    except (TypeError, ValueError):
+        pass
+    if len(resp.raw_response.content) < MIN_CONTENT_BYTES:
+        log_debug(f"Skipping {url}: body too small to hold {MIN_WORDS_PER_PAGE} words")
         return extracted_links
 
     try:
@@ -302,49 +533,57 @@ def extract_next_links(url, resp):
         # Use original URL for statistics to preserve the URL that was actually crawled
         defrag_url, _ = urldefrag(url)  # Use original URL instead of final_url
         
-        # Parse content
+        # Hand the CPU-heavy parse to a pool process; this thread only
+        # merges the results into shared state.
         try:
-            soup = BeautifulSoup(resp.raw_response.content, 'html.parser')
+            token_counts, content_hash, hrefs = get_parse_pool().submit(
+                parse_page, resp.raw_response.content).result()
         except Exception as e:
             log_info(f"Error parsing HTML for {url}: {str(e)}")
             return extracted_links
-        
-        # Remove script, style, and other non-content elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'noscript', 'meta', 'link']):
-            element.decompose()
-            
-        # Get text content
-        text = soup.get_text(separator=' ', strip=True)
-        words = tokenize_text(text)
-        
+
         # Skip pages with too little content
-        if len(words) < MIN_WORDS_PER_PAGE:
-            log_info(f"Skipping {url} due to insufficient content: {len(words)} words")
+        word_count = sum(token_counts.values())
+        if word_count < MIN_WORDS_PER_PAGE:
+            log_debug(f"Skipping {url} due to insufficient content: {word_count} words")
             return extracted_links
-            
+
         # Check for traps
-        if is_trap(defrag_url, text):
+        if is_trap(defrag_url, content_hash):
             return extracted_links
-            
+
         # Process valid page and update statistics
-        update_stats(defrag_url, words)
-        
-        # Extract links
+        update_stats(defrag_url, token_counts)
+
+        # Extract links. Most hrefs are absolute or root-relative, so
+        # resolve those with string concatenation and keep the (slow,
+        # pure-Python) urljoin for the rarer genuinely relative ones.
+        base_parsed = urlsplit(final_url)
+        base_root = f"{base_parsed.scheme}://{base_parsed.netloc}"
         seen_urls = set()  # Track URLs we've seen in this page
-        for link in soup.find_all('a', href=True):
-            href = link['href'].strip()
-            if not href:
+        for href in hrefs:
+            # Fragment-only links point back into the same page
+            if not href or href.startswith('#'):
                 continue
-                
+
             try:
                 # Resolve relative URLs against the final URL after redirects
-                absolute_url = urljoin(final_url, href)
-                # Remove fragments from the resolved URL
-                clean_url, _ = urldefrag(absolute_url)
-                if clean_url not in extracted_links:
+                if href.startswith(('http://', 'https://')):
+                    absolute_url = href
+                elif href.startswith('//'):
+                    absolute_url = f"{base_parsed.scheme}:{href}"
+                elif href.startswith('/'):
+                    absolute_url = base_root + href
+                else:
+                    absolute_url = urljoin(final_url, href)
+                # Remove fragments from the resolved URL; a plain string
+                # split is enough since the URL is already absolute
+                clean_url = absolute_url.partition('#')[0]
+                if clean_url not in seen_urls:
+                    seen_urls.add(clean_url)
                     extracted_links.append(clean_url)
             except Exception as e:
-                log_info(f"Error processing link {href}: {str(e)}")
+                log_debug(f"Error processing link {href}: {str(e)}")
                 continue
                 
     except Exception as e:
@@ -354,120 +593,103 @@ def extract_next_links(url, resp):
 
 def is_valid(url):
     try:
-        parsed = urlparse(url)
-        if parsed.scheme not in set(["http", "https"]):
-            log_info(f"Rejecting {url}: invalid scheme {parsed.scheme}")
+        parsed = urlsplit(url)
+        if parsed.scheme not in VALID_SCHEMES:
+            log_debug(f"Rejecting {url}: invalid scheme {parsed.scheme}")
             return False
 
-        # Check if URL is within allowed domains
+        # Lowercase netloc/path once; every later check reuses these
         netloc = parsed.netloc.lower()
-        
-        # Check for the allowed domain patterns
-        valid_domains = [
-            "ics.uci.edu",
-            "cs.uci.edu",
-            "informatics.uci.edu",
-            "stat.uci.edu"
-        ]
-        
+        path_lower = parsed.path.lower()
+
+        # Check file extensions to avoid, before anything costlier runs
+        dot = path_lower.rfind('.')
+        if dot != -1 and path_lower[dot + 1:] in BAD_EXTENSIONS:
+            log_debug(f"Rejecting {url}: invalid file extension")
+            return False
+
         # The domain must exactly match one of the valid domains at the end of netloc
         # This prevents matching substrings in paths or subdomains of other sites
-        if not any((netloc == domain or netloc.endswith("." + domain)) 
-                  for domain in valid_domains):
-            log_info(f"Rejecting {url}: domain {netloc} not in allowed list")
+        if netloc not in ALLOWED_DOMAINS and not netloc.endswith(ALLOWED_DOMAIN_SUFFIXES):
+            log_debug(f"Rejecting {url}: domain {netloc} not in allowed list")
             return False
-            
+
+        # Decode the query string once; every branch below reuses it
+        query_params = (
+            dict(parse_qsl(parsed.query, keep_blank_values=True))
+            if parsed.query else {})
+
         # Special handling for cbcl.ics.uci.edu URLs
         if 'cbcl.ics.uci.edu' in netloc:
             # Block diff views, edit pages, backlinks and other problematic actions
-            if parsed.query:
-                query_params = dict(param.split('=', 1) for param in parsed.query.split('&') if '=' in param)
-                if any(param in query_params for param in ['do']):
+            if query_params:
+                if 'do' in query_params:
                     action = query_params.get('do', '')
-                    if action in ['login', 'recent', 'revisions', 'diff', 'edit', 'backlink', 'resendpwd', 'index', '']:
-                        log_info(f"Rejecting {url}: cbcl action parameter detected: {action}")
+                    if action in CBCL_BLOCKED_ACTIONS:
+                        log_debug(f"Rejecting {url}: cbcl action parameter detected: {action}")
                         return False
                 
                 # Check for PDFs in the id parameter
                 if 'id' in query_params and '.pdf' in query_params['id'].lower():
-                    log_info(f"Rejecting {url}: PDF document referenced in id parameter")
+                    log_debug(f"Rejecting {url}: PDF document referenced in id parameter")
                     return False
 
             # Block URLs that seem to encode external links in the path
-            if '/http/' in parsed.path.lower() or '/www.' in parsed.path.lower():
-                log_info(f"Rejecting {url}: external link encoded in path")
+            if '/http/' in path_lower or '/www.' in path_lower:
+                log_debug(f"Rejecting {url}: external link encoded in path")
                 return False
 
         # Special handling for ics.uci.edu/people/ URLs with filters
-        if 'ics.uci.edu' in netloc and '/people/' in parsed.path.lower():
+        if 'ics.uci.edu' in netloc and '/people/' in path_lower:
             if parsed.query and 'filter' in parsed.query.lower():
-                log_info(f"Rejecting {url}: ics.uci.edu people filter detected")
+                log_debug(f"Rejecting {url}: ics.uci.edu people filter detected")
                 return False
 
         # Special handling for grape.ics.uci.edu wiki URLs
         if 'grape.ics.uci.edu' in netloc and '/wiki/' in parsed.path:
-            if parsed.query:
-                query_params = dict(param.split('=', 1) for param in parsed.query.split('&') if '=' in param)
-                # Block version parameters and diff actions
-                if 'version' in query_params or 'action' in query_params:
-                    log_info(f"Rejecting {url}: grape wiki version/action parameter detected")
-                    return False
+            # Block version parameters and diff actions
+            if 'version' in query_params or 'action' in query_params:
+                log_debug(f"Rejecting {url}: grape wiki version/action parameter detected")
+                return False
 
         # Filter directory sorting parameters
         if parsed.query:
             # Check for directory sorting parameters (C=N|M|S|D for Name|Modified|Size|Description, O=A|D for Ascending|Descending)
             if any(param.startswith('C=') or param.startswith('O=') for param in parsed.query.split(';')):
-                log_info(f"Rejecting {url}: directory sorting parameters detected")
+                log_debug(f"Rejecting {url}: directory sorting parameters detected")
                 return False
 
         # Special handling for wiki URLs
         if ('wiki.ics.uci.edu' in netloc or 'swiki.ics.uci.edu' in netloc):
             # Block problematic wiki query parameters that create duplicate content
-            if parsed.query:
-                query_params = dict(param.split('=', 1) for param in parsed.query.split('&') if '=' in param)
+            if query_params:
                 # Block certain actions and views that duplicate content
-                if any(param in query_params for param in ['do', 'rev', 'tab_files', 'tab_details', 'image']):
-                    log_info(f"Rejecting {url}: wiki action/view parameter detected")
+                if any(param in query_params for param in WIKI_BLOCKED_PARAMS):
+                    log_debug(f"Rejecting {url}: wiki action/view parameter detected")
                     return False
                 # Block media namespace and other utility pages
-                if query_params.get('ns') in ['projects', 'media', 'wiki', 'windows']:
-                    log_info(f"Rejecting {url}: wiki utility namespace detected")
+                if query_params.get('ns') in WIKI_UTILITY_NAMESPACES:
+                    log_debug(f"Rejecting {url}: wiki utility namespace detected")
                     return False
             
         # Check for potential PDF files that don't end in .pdf
-        path_lower = parsed.path.lower()
-        if any(pdf_indicator in path_lower for pdf_indicator in ['/pdf/', '/pdfs/', '/files/pdf/']):
-            log_info(f"Rejecting {url}: likely PDF document based on path")
-            return False
-            
-        # Check for file extensions to avoid
-        if re.match(
-            r".*\.(css|js|bmp|gif|jpe?g|ico"
-            + r"|png|tiff?|mid|mp2|mp3|mp4"
-            + r"|wav|avi|mov|mpeg|ram|m4v|mkv|ogg|ogv|pdf"
-            + r"|ps|eps|tex|ppt|pptx|pps|ppsx|doc|docx|xls|xlsx|names"
-            + r"|data|dat|exe|bz2|tar|msi|bin|7z|psd|dmg|iso"
-            + r"|epub|dll|cnf|tgz|sha1|sql|mpg|ova"
-            + r"|thmx|mso|arff|rtf|jar|csv"
-            + r"|rm|smil|wmv|swf|wma|zip|rar|gz)$", path_lower):
-            log_info(f"Rejecting {url}: invalid file extension")
+        if any(pdf_indicator in path_lower for pdf_indicator in PDF_PATH_INDICATORS):
+            log_debug(f"Rejecting {url}: likely PDF document based on path")
             return False
             
         # Check for problematic query strings that might cause infinite loops
         if parsed.query:
-            # Check for filter parameters that might create duplicate content
-            if any(param.startswith('filter') for param in parsed.query.split('&')):
-                # Count the number of filter parameters
-                filter_count = sum(1 for param in parsed.query.split('&') if param.startswith('filter'))
-                if filter_count >= 2:  # If there are multiple filter parameters, likely a trap
-                    log_info(f"Rejecting {url}: contains multiple filter parameters in query string")
-                    return False
+            # Multiple filter parameters likely mean a faceted-search trap;
+            # one regex pass counts them
+            if len(FILTER_PARAM_RE.findall(parsed.query)) >= 2:
+                log_debug(f"Rejecting {url}: contains multiple filter parameters in query string")
+                return False
                     
         return True
 
     except TypeError:
-        log_info(f"TypeError for {url}")
+        log_debug(f"TypeError for {url}")
         return False
     except Exception as e:
-        log_info(f"Error validating {url}: {str(e)}")
+        log_debug(f"Error validating {url}: {str(e)}")
         return False
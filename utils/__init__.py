@@ -1,8 +1,13 @@
 import os
 import logging
+from functools import lru_cache
 from hashlib import sha256
 from urllib.parse import urlparse
 
+# add_url and mark_url_complete both hash the same url, so cache the
+# pure-Python parse instead of repeating it per call
+urlparse = lru_cache(maxsize=65536)(urlparse)
+
 def get_logger(name, filename=None):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)